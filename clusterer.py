@@ -0,0 +1,319 @@
+# clusterer.py
+# MinHash signatures + LSH index for grouping similar documents into topic folders
+
+import os
+import re
+import zlib
+from collections import Counter
+import numpy as np
+
+# ==============================
+# MinHash / LSH Settings
+# ==============================
+NUM_PERM = 128          # signature length (hash functions)
+BANDS = 64              # LSH bands -> BANDS * ROWS must equal NUM_PERM
+ROWS = 2                # rows per band
+MAX_KEYWORDS = 50       # top keywords per document used as the shingle set
+SIM_THRESHOLD = 0.3     # estimated Jaccard to a cluster's representative needed to join it
+MAX_BUCKET_CANDIDATES = 20  # newest members checked per bucket (keeps lookups O(1))
+PENDING_SIZE = 1024     # new band keys buffered before merging into the sorted table
+
+# Note on recall: assignment is a single greedy pass (clusters are never
+# merged), so results depend on file order. A new document is scored against
+# each candidate cluster's representative (its first member), not its closest
+# member, so clusters can't chain into each other through borderline files.
+# Representatives are kept in a separate, uncapped table, so the bucket cap
+# above never hides a cluster. Documents whose similarity to their topic's
+# representative stays below SIM_THRESHOLD still open new clusters.
+
+INDEX_FILE = ".autotagr_clusters.npz"
+
+_PRIME = (1 << 31) - 1
+_MAX_HASH = np.uint64(_PRIME)
+_STOPWORDS = set([
+    "the","is","and","in","on","at","of","to","a","an","for","by","with","about",
+    "from","into","that","this","it","as","be","are","or","was","were","but",
+    "can","if","then","so","such","not","no","yes","do","does","did","you",
+    "we","they","he","she","him","her","them","our","your","their","has","have",
+    "had","will","would","which","there","these","those","also","all","any",
+    # Generic filler that shows up in documents of every topic
+    "been","being","its","his","who","whom","what","when","where","why","how",
+    "than","too","very","just","only","own","same","other","each","both","few",
+    "more","most","some","many","much","over","under","again","further","once",
+    "here","out","off","up","down","between","through","during","before","after",
+    "above","below","should","could","may","might","must","shall","one","two",
+    "three","first","second","new","use","used","using","make","made","get",
+    "see","per","via","within","without","however","therefore","thus","etc",
+    "page","pages","section","chapter","table","figure","total","number","date",
+    "name","file","document","report","information","data","example","note",
+    "please","thank","thanks","dear","regards","sincerely","com","www","http",
+    "https","sheet","rows","row","columns","column","contains","sample","nan"
+])
+
+# Fixed seed so signatures stay comparable across runs (needed for persistence)
+_rng = np.random.RandomState(2024)
+_PERM_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+
+# Constants for mixing a band's rows into a single 64-bit key
+_BAND_SALT = np.arange(1, BANDS + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+_BAND_MIX = np.uint64(0xBF58476D1CE4E5B9)
+
+
+def _keywords(text: str) -> list:
+    """Most frequent content words of a document (its topic fingerprint)."""
+    words = re.findall(r"[a-zA-Z]{3,}", text.lower())
+    freq = Counter(w for w in words if w not in _STOPWORDS)
+    return [w for w, _ in freq.most_common(MAX_KEYWORDS)]
+
+
+def compute_signature(text: str):
+    """
+    Build a MinHash signature from the document's keywords.
+    Returns None if the text has no usable words.
+    """
+    keywords = _keywords(text)
+    if not keywords:
+        return None
+
+    # crc32 is stable across processes (unlike hash()), so saved signatures stay valid
+    x = np.array([zlib.crc32(w.encode("utf-8")) for w in keywords], dtype=np.uint64)
+    hashed = (_PERM_A[:, None] * x[None, :] + _PERM_B[:, None]) % _MAX_HASH
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def _band_keys(signatures):
+    """One uint64 key per (document, band); band index is mixed in so keys never clash across bands."""
+    rows = signatures.reshape(-1, BANDS, ROWS).astype(np.uint64)
+    keys = np.broadcast_to(_BAND_SALT, rows.shape[:2]).copy()
+    for r in range(ROWS):
+        keys = (keys ^ rows[:, :, r]) * _BAND_MIX
+    return keys
+
+
+def estimate_similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity = fraction of matching MinHash slots."""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+# ==============================
+# LSH Band Table
+# ==============================
+class _BandTable:
+    """
+    Maps band keys to item ids using one sorted numpy array + searchsorted.
+    New keys go to a small buffer and are merged in batches, so there are
+    no per-document Python dict entries.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.items = np.empty(0, dtype=np.int64)
+        self._pending_keys = np.empty((PENDING_SIZE, BANDS), dtype=np.uint64)
+        self._pending_items = np.empty(PENDING_SIZE, dtype=np.int64)
+        self._pending = 0
+
+    def build(self, band_keys, items):
+        """Replace the table with `items` (one per row of band_keys)."""
+        keys = band_keys.ravel()
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.items = np.repeat(np.asarray(items, dtype=np.int64), BANDS)[order]
+        self._pending = 0
+
+    def add(self, band_keys, item: int):
+        if self._pending == PENDING_SIZE:
+            self._flush()
+        self._pending_keys[self._pending] = band_keys
+        self._pending_items[self._pending] = item
+        self._pending += 1
+
+    def _flush(self):
+        n = self._pending
+        keys = self._pending_keys[:n].ravel()
+        items = np.repeat(self._pending_items[:n], BANDS)
+        order = np.argsort(keys, kind="stable")
+        # side="right" keeps older items first within a bucket
+        pos = np.searchsorted(self.keys, keys[order], side="right")
+        self.keys = np.insert(self.keys, pos, keys[order])
+        self.items = np.insert(self.items, pos, items[order])
+        self._pending = 0
+
+    def query(self, band_keys, limit=None):
+        """Items sharing at least one band (at most `limit` newest per bucket)."""
+        found = []
+        room = np.full(BANDS, limit or 0)
+        if self._pending:
+            # Buffered items are the newest, so they take their share of the cap first
+            hit = self._pending_keys[:self._pending] == band_keys
+            if limit:
+                hit &= np.cumsum(hit[::-1], axis=0)[::-1] <= limit
+                room -= hit.sum(axis=0)
+            found.append(self._pending_items[:self._pending][hit.any(axis=1)])
+
+        lo = np.searchsorted(self.keys, band_keys, side="left")
+        hi = np.searchsorted(self.keys, band_keys, side="right")
+        found.extend(
+            self.items[max(l, h - r) if limit else l:h]
+            for l, h, r in zip(lo, hi, room) if h > l
+        )
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+
+# ==============================
+# Cluster Index (persisted per folder)
+# ==============================
+class ClusterIndex:
+    """
+    Stores document signatures, their cluster ids and final relative paths.
+    A new document is only compared against LSH candidates sharing a band
+    (plus cluster representatives), never the whole folder.
+    """
+
+    def __init__(self):
+        self._signatures = np.empty((0, NUM_PERM), dtype=np.uint32)
+        self._cluster_ids = np.empty(0, dtype=np.int64)
+        self._count = 0
+        self.paths = []         # path of each document relative to the folder
+        self.labels = {}        # cluster id -> folder name
+        self._label_ids = {}    # folder name -> cluster id
+        self._rep_docs = []     # cluster id -> doc index of its representative
+        self._docs = _BandTable()   # every document (capped per bucket)
+        self._reps = _BandTable()   # cluster representatives (uncapped)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def signatures(self):
+        return self._signatures[:self._count]
+
+    @property
+    def cluster_ids(self):
+        return self._cluster_ids[:self._count]
+
+    def match(self, sig):
+        """Return the folder name of the most similar cluster, or None."""
+        keys = _band_keys(sig)[0]
+        docs = np.union1d(
+            self._docs.query(keys, MAX_BUCKET_CANDIDATES),
+            self._reps.query(keys),
+        )
+        if not len(docs):
+            return None
+
+        # Score each candidate cluster by its representative, not its closest member
+        clusters = np.unique(self.cluster_ids[docs])
+        reps = [self._rep_docs[c] for c in clusters]
+        sims = np.count_nonzero(self.signatures[reps] == sig, axis=1) / NUM_PERM
+        best = int(np.argmax(sims))
+        if sims[best] < SIM_THRESHOLD:
+            return None
+        return self.labels[int(clusters[best])]
+
+    def new_label(self, label: str, folder_path: str, reserved=()) -> str:
+        """Folder name for a new cluster, unused by the index and on disk."""
+        taken = set(self._label_ids) | set(reserved)
+        candidate = label
+        count = 1
+        while candidate in taken or os.path.exists(os.path.join(folder_path, candidate)):
+            candidate = f"{label}_{count}"
+            count += 1
+        return candidate
+
+    def add(self, sig, folder_name: str, path: str):
+        """Record a document stored at `path` inside cluster `folder_name`."""
+        cluster_id = self._label_ids.get(folder_name)
+        is_new = cluster_id is None
+        if is_new:
+            cluster_id = len(self.labels)
+            self.labels[cluster_id] = folder_name
+            self._label_ids[folder_name] = cluster_id
+            self._rep_docs.append(self._count)
+
+        idx = self._count
+        if idx == len(self._signatures):
+            size = max(1024, 2 * idx)
+            self._signatures = np.resize(self._signatures, (size, NUM_PERM))
+            self._cluster_ids = np.resize(self._cluster_ids, size)
+        self._signatures[idx] = sig
+        self._cluster_ids[idx] = cluster_id
+        self._count += 1
+        self.paths.append(path)
+
+        keys = _band_keys(sig)[0]
+        self._docs.add(keys, idx)
+        if is_new:
+            self._reps.add(keys, idx)
+
+    def _rebuild(self):
+        keys = _band_keys(self.signatures)
+        self._docs.build(keys, np.arange(self._count))
+        self._rep_docs = list(np.unique(self.cluster_ids, return_index=True)[1])
+        self._reps.build(keys[self._rep_docs], self._rep_docs)
+
+    # ------------------------------
+    # Persistence
+    # ------------------------------
+    def save(self, folder_path: str):
+        path = os.path.join(folder_path, INDEX_FILE)
+        ids = sorted(self.labels)
+        # Write to a temp file first so a crash never leaves a half-written index
+        with open(path + ".tmp", "wb") as f:
+            np.savez_compressed(
+                f,
+                signatures=self.signatures,
+                cluster_ids=self.cluster_ids,
+                paths=np.array(self.paths, dtype=str),
+                label_ids=np.array(ids, dtype=np.int64),
+                labels=np.array([self.labels[i] for i in ids], dtype=str),
+            )
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, folder_path: str):
+        """
+        Load a saved index, or return an empty one if none (or unreadable).
+        Entries whose files were moved or deleted since the last run are dropped.
+        """
+        index = cls()
+        path = os.path.join(folder_path, INDEX_FILE)
+        if not os.path.exists(path):
+            return index
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                signatures = data["signatures"]
+                if signatures.ndim != 2 or signatures.shape[1] != NUM_PERM:
+                    print("⚠️ Cluster index uses different settings, starting fresh.")
+                    return index
+                cluster_ids = data["cluster_ids"].astype(np.int64)
+                paths = [str(p) for p in data["paths"]]
+                label_ids = data["label_ids"].astype(np.int64)
+                labels = [str(l) for l in data["labels"]]
+            if not len(cluster_ids) == len(paths) == len(signatures):
+                raise ValueError("index arrays have different lengths")
+            if len(label_ids) != len(labels) or len(set(labels)) != len(labels):
+                raise ValueError("label arrays have different lengths or duplicate names")
+            if not np.isin(cluster_ids, label_ids).all():
+                raise ValueError("documents refer to unknown clusters")
+
+            keep = np.array([os.path.exists(os.path.join(folder_path, p)) for p in paths], dtype=bool)
+            cluster_ids = cluster_ids[keep]
+
+            # Renumber the clusters that still have files as 0..n-1
+            names = dict(zip(label_ids.tolist(), labels))
+            live, cluster_ids = np.unique(cluster_ids, return_inverse=True)
+            index._signatures = signatures[keep].astype(np.uint32)
+            index._cluster_ids = cluster_ids.astype(np.int64)
+            index._count = len(index._cluster_ids)
+            index.paths = [p for p, k in zip(paths, keep) if k]
+            index.labels = {i: names[int(c)] for i, c in enumerate(live)}
+            index._label_ids = {l: i for i, l in index.labels.items()}
+            index._rebuild()
+        except Exception as e:
+            print(f"⚠️ Could not load cluster index: {e}")
+            return cls()
+        return index
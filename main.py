@@ -12,6 +12,7 @@ from extractor import (
 )
 from summarizer import generate_summary, generate_tags
 from sorter import sort_files
+from clusterer import INDEX_FILE
 
 # ==============================
 # Temporary folder setup & cleanup
@@ -183,6 +184,12 @@ with col2:
             st.success(sort_files(st.session_state.folder_path, rename=False))
         else: st.error("❌ Please select a valid folder.")
 
+    if st.button("Sort by Topic (Clustering)"):
+        if st.session_state.folder_path and os.path.exists(st.session_state.folder_path):
+            with st.spinner("⏳ Grouping similar files..."):
+                st.success(sort_files(st.session_state.folder_path, cluster=True))
+        else: st.error("❌ Please select a valid folder.")
+
     if st.button("Sort All (AI + Rename)"):
         if st.session_state.folder_path and os.path.exists(st.session_state.folder_path):
             with st.spinner("⏳ Sorting with AI..."):
@@ -196,7 +203,7 @@ with col3:
     st.subheader("👀 Quick Preview")
 
     if st.session_state.folder_path and os.path.exists(st.session_state.folder_path):
-        files = [f for f in os.listdir(st.session_state.folder_path) if os.path.isfile(os.path.join(st.session_state.folder_path,f))]
+        files = [f for f in os.listdir(st.session_state.folder_path) if os.path.isfile(os.path.join(st.session_state.folder_path,f)) and not f.startswith(INDEX_FILE)]
         if files:
             for file in files:
                 file_path = os.path.join(st.session_state.folder_path, file)
@@ -4,40 +4,46 @@
 import os
 import shutil
 from summarizer import generate_summary, generate_tags
-from extractor import extract_text_from_pdf, extract_text_from_docx, extract_text_from_txt
+from extractor import extract_text, extract_text_from_pdf, extract_text_from_docx, extract_text_from_txt
+from clusterer import ClusterIndex, compute_signature, INDEX_FILE
+
+# Type-based subfolders (also the fallback for files clustering can't read)
+EXTENSION_FOLDERS = {
+    ".pdf": "PDF",
+    ".docx": "DOCX",
+    ".txt": "TXT",
+    ".jpg": "Images",
+    ".jpeg": "Images",
+    ".png": "Images",
+    ".xls": "Excel",
+    ".xlsx": "Excel",
+    ".csv": "Excel"
+}
 
 # ==============================
 # Basic Sort by File Type
 # ==============================
-def sort_files(folder_path: str, rename: bool = False):
+def sort_files(folder_path: str, rename: bool = False, cluster: bool = False):
     """
     Sort files into subfolders by their extension.
     If rename=True, use AI auto rename.
+    If cluster=True, group similar documents into topic folders.
     """
     if not os.path.exists(folder_path):
         return "❌ Folder path does not exist."
 
+    if cluster:
+        return cluster_files(folder_path)
+
     if rename:
         return auto_rename_files(folder_path)
 
-    extensions = {
-        ".pdf": "PDF",
-        ".docx": "DOCX",
-        ".txt": "TXT",
-        ".jpg": "Images",
-        ".jpeg": "Images",
-        ".png": "Images",
-        ".xls": "Excel",
-        ".xlsx": "Excel",
-        ".csv": "Excel"
-    }
-
     for file in os.listdir(folder_path):
         file_path = os.path.join(folder_path, file)
 
-        if os.path.isfile(file_path):
+        if os.path.isfile(file_path) and not file.startswith(INDEX_FILE):
             ext = os.path.splitext(file)[1].lower()
-            folder_name = extensions.get(ext, "Others")
+            folder_name = EXTENSION_FOLDERS.get(ext, "Others")
 
             target_dir = os.path.join(folder_path, folder_name)
             os.makedirs(target_dir, exist_ok=True)
@@ -60,7 +66,8 @@ def auto_rename_files(folder_path: str):
     for file in os.listdir(folder_path):
         file_path = os.path.join(folder_path, file)
 
-        if not os.path.isfile(file_path):
+        # Skip folders and the topic clustering index
+        if not os.path.isfile(file_path) or file.startswith(INDEX_FILE):
             continue
 
         ext = os.path.splitext(file)[1].lower()
@@ -105,3 +112,71 @@ def auto_rename_files(folder_path: str):
             shutil.move(file_path, os.path.join(target_dir, file))
 
     return "✅ Files sorted and renamed successfully."
+
+
+# ==============================
+# Sort by Topic (MinHash + LSH)
+# ==============================
+def cluster_files(folder_path: str):
+    """
+    Group similar documents into topic folders.
+    Signatures are saved in the folder, so files added later are
+    assigned to the existing topic folders on the next run.
+    """
+    if not os.path.exists(folder_path):
+        return "❌ Folder path does not exist."
+
+    index = ClusterIndex.load(folder_path)
+    reserved = set(EXTENSION_FOLDERS.values()) | {"Others"}
+    clustered = 0
+
+    try:
+        for file in os.listdir(folder_path):
+            file_path = os.path.join(folder_path, file)
+
+            if not os.path.isfile(file_path) or file.startswith(INDEX_FILE):
+                continue
+
+            sig = None
+            try:
+                text = extract_text(file_path)
+                # Only the extractor's own failure messages, not documents starting with "Error"
+                if text and not text.startswith(("Error reading ", "⚠️ ")):
+                    sig = compute_signature(text)
+            except Exception as e:
+                print(f"⚠️ Could not extract text from {file}: {e}")
+
+            name, ext = os.path.splitext(file)
+            if sig is not None:
+                folder_name = index.match(sig)
+                if folder_name is None:
+                    tags = generate_tags(text, max_tags=2)
+                    folder_name = index.new_label("_".join(tags) or "Topic", folder_path, reserved)
+            else:
+                # Fallback → no text to compare, sort by type
+                folder_name = EXTENSION_FOLDERS.get(ext.lower(), "Others")
+
+            try:
+                target_dir = os.path.join(folder_path, folder_name)
+                os.makedirs(target_dir, exist_ok=True)
+
+                # Handle duplicate names
+                new_path = os.path.join(target_dir, file)
+                count = 1
+                while os.path.exists(new_path):
+                    new_path = os.path.join(target_dir, f"{name}_{count}{ext}")
+                    count += 1
+
+                shutil.move(file_path, new_path)
+            except Exception as e:
+                print(f"⚠️ Could not move {file}: {e}")
+                continue
+
+            if sig is not None:
+                index.add(sig, folder_name, os.path.relpath(new_path, folder_path))
+                clustered += 1
+    finally:
+        # Save even if a file fails, so moved files keep their clusters
+        index.save(folder_path)
+
+    return f"✅ {clustered} files grouped into {len(index.labels)} topic folders."
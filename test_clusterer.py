@@ -0,0 +1,166 @@
+# test_clusterer.py
+# Tests for MinHash/LSH topic clustering
+
+import os
+import random
+import numpy as np
+import pytest
+from clusterer import (
+    ClusterIndex, compute_signature, _band_keys, _BandTable,
+    INDEX_FILE, MAX_BUCKET_CANDIDATES, NUM_PERM, PENDING_SIZE,
+)
+
+FINANCE = (
+    "quarterly revenue profit margin invoice budget forecast accounting "
+    "expenses balance sheet audit taxes payroll cashflow investment dividend"
+)
+ASTRONOMY = (
+    "telescope galaxy nebula planet orbit comet asteroid stellar supernova "
+    "cosmology spectrum eclipse constellation meteor quasar pulsar"
+)
+
+
+def _assign(index, text, folder_path, label):
+    """Cluster `text` like cluster_files does and write it to disk."""
+    sig = compute_signature(text)
+    folder_name = index.match(sig) or index.new_label(label, folder_path)
+    os.makedirs(os.path.join(folder_path, folder_name), exist_ok=True)
+    path = os.path.join(folder_name, f"{label}_{len(index)}.txt")
+    with open(os.path.join(folder_path, path), "w") as f:
+        f.write(text)
+    index.add(sig, folder_name, path)
+    return folder_name
+
+
+def test_similar_texts_share_cluster(tmp_path):
+    index = ClusterIndex()
+    first = _assign(index, FINANCE + " report", tmp_path, "Finance")
+    second = _assign(index, FINANCE + " summary", tmp_path, "Other")
+    assert first == second == "Finance"
+
+
+def test_unrelated_texts_get_different_clusters(tmp_path):
+    index = ClusterIndex()
+    finance = _assign(index, FINANCE, tmp_path, "Finance")
+    astronomy = _assign(index, ASTRONOMY, tmp_path, "Astronomy")
+    assert finance != astronomy
+    assert len(index.labels) == 2
+
+
+def test_topics_sharing_filler_words_stay_separate(tmp_path):
+    rng = random.Random(0)
+    filler = ("report data page total information section document note "
+              "overview project update").split()
+    topics = {"Finance": FINANCE.split(), "Astronomy": ASTRONOMY.split()}
+
+    index = ClusterIndex()
+    assigned = {name: set() for name in topics}
+    for i in range(40):
+        name = "Finance" if i % 2 else "Astronomy"
+        words = rng.sample(topics[name], 12) + filler * 3
+        assigned[name].add(_assign(index, " ".join(words), tmp_path, name))
+
+    assert assigned == {"Finance": {"Finance"}, "Astronomy": {"Astronomy"}}
+
+
+def test_new_label_avoids_existing_folders(tmp_path):
+    (tmp_path / "Finance").mkdir()
+    index = ClusterIndex()
+    assert index.new_label("Finance", tmp_path) == "Finance_1"
+    assert index.new_label("PDF", tmp_path, reserved={"PDF"}) == "PDF_1"
+
+
+def test_band_table_matches_brute_force():
+    rng = np.random.RandomState(0)
+    # Few distinct values per slot so buckets collide a lot
+    sigs = rng.randint(0, 4, size=(2 * PENDING_SIZE + 100, NUM_PERM)).astype(np.uint32)
+    keys = _band_keys(sigs)
+
+    table = _BandTable()
+    table.build(keys[:100], np.arange(100))
+    for i in range(100, len(keys)):
+        table.add(keys[i], i)
+
+    for q in rng.randint(0, len(keys), size=50):
+        expected = np.flatnonzero((keys == keys[q]).any(axis=1))
+        assert np.array_equal(table.query(keys[q]), expected)
+
+
+@pytest.mark.parametrize("total", [MAX_BUCKET_CANDIDATES + 10, PENDING_SIZE + 10])
+def test_bucket_cap_keeps_newest_and_representative(total):
+    # The second size spans the sorted table and the pending buffer
+    index = ClusterIndex()
+    sig = compute_signature(FINANCE)
+    for i in range(total):
+        index.add(sig, "Finance", f"Finance/{i}.txt")
+
+    keys = _band_keys(sig)[0]
+    newest = index._docs.query(keys, MAX_BUCKET_CANDIDATES)
+    assert list(newest) == list(range(total - MAX_BUCKET_CANDIDATES, total))
+    assert list(index._reps.query(keys)) == [0]
+    assert index.match(sig) == "Finance"
+
+
+def test_save_load_round_trip(tmp_path):
+    index = ClusterIndex()
+    _assign(index, FINANCE, tmp_path, "Finance")
+    _assign(index, ASTRONOMY, tmp_path, "Astronomy")
+    index.save(tmp_path)
+
+    loaded = ClusterIndex.load(tmp_path)
+    assert len(loaded) == 2
+    assert loaded.labels == index.labels
+    assert loaded.paths == index.paths
+    assert loaded.match(compute_signature(ASTRONOMY + " observatory")) == "Astronomy"
+
+
+def test_load_drops_missing_files(tmp_path):
+    index = ClusterIndex()
+    _assign(index, FINANCE, tmp_path, "Finance")
+    _assign(index, ASTRONOMY, tmp_path, "Astronomy")
+    index.save(tmp_path)
+    os.remove(tmp_path / index.paths[0])
+
+    loaded = ClusterIndex.load(tmp_path)
+    assert loaded.paths == index.paths[1:]
+    assert loaded.labels == {0: "Astronomy"}
+    assert loaded.match(compute_signature(FINANCE)) is None
+
+
+def test_load_missing_index_is_empty(tmp_path):
+    index = ClusterIndex.load(tmp_path)
+    assert len(index) == 0
+    assert index.match(compute_signature(FINANCE)) is None
+
+
+def test_load_corrupt_index_starts_fresh(tmp_path):
+    (tmp_path / INDEX_FILE).write_bytes(b"not an npz file")
+    index = ClusterIndex.load(tmp_path)
+    assert len(index) == 0
+    assert index.labels == {}
+
+
+def _write_index(folder_path, cluster_ids, label_ids, labels):
+    (folder_path / "Finance").mkdir()
+    (folder_path / "Finance" / "a.txt").write_text(FINANCE)
+    with open(folder_path / INDEX_FILE, "wb") as f:
+        np.savez_compressed(
+            f,
+            signatures=compute_signature(FINANCE)[None, :],
+            cluster_ids=np.array(cluster_ids, dtype=np.int64),
+            paths=np.array([os.path.join("Finance", "a.txt")], dtype=str),
+            label_ids=np.array(label_ids, dtype=np.int64),
+            labels=np.array(labels, dtype=str),
+        )
+
+
+def test_load_unknown_cluster_id_starts_fresh(tmp_path):
+    _write_index(tmp_path, [5], [0], ["Finance"])
+    index = ClusterIndex.load(tmp_path)
+    assert len(index) == 0
+    assert index.match(compute_signature(FINANCE)) is None
+
+
+def test_load_mismatched_labels_starts_fresh(tmp_path):
+    _write_index(tmp_path, [0], [0, 1], ["Finance"])
+    assert len(ClusterIndex.load(tmp_path)) == 0
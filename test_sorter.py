@@ -0,0 +1,125 @@
+# test_sorter.py
+# Tests for topic clustering in sorter.cluster_files
+
+import os
+import sys
+import types
+import pytest
+from clusterer import ClusterIndex, INDEX_FILE, _keywords
+
+# extractor needs the file-handling packages from requirements.txt
+pytest.importorskip("docx")
+pytest.importorskip("pandas")
+pytest.importorskip("PyPDF2")
+
+FINANCE = (
+    "Quarterly revenue and profit margin rose while the invoice backlog shrank. "
+    "The budget forecast covers accounting expenses, audit fees, taxes, payroll "
+    "and cashflow, plus dividend and investment plans for the balance sheet."
+)
+ASTRONOMY = (
+    "The telescope captured a distant galaxy and a bright nebula. Each planet "
+    "orbit, comet and asteroid was charted, and the stellar spectrum hinted at "
+    "a supernova, a quasar and a pulsar near the constellation."
+)
+
+
+@pytest.fixture
+def sorter(monkeypatch):
+    """Import sorter with a light summarizer (the real one loads torch + streamlit)."""
+    fake = types.ModuleType("summarizer")
+    fake.generate_summary = lambda text, max_words=150: text[:max_words]
+    fake.generate_tags = lambda text, max_tags=5: [w.capitalize() for w in _keywords(text)[:max_tags]]
+    monkeypatch.setitem(sys.modules, "summarizer", fake)
+    monkeypatch.delitem(sys.modules, "sorter", raising=False)
+    import sorter
+    return sorter
+
+
+def _find(folder, name):
+    """Subfolder that `name` was moved into."""
+    for sub in os.listdir(folder):
+        if os.path.isfile(os.path.join(folder, sub, name)):
+            return sub
+    return None
+
+
+def test_cluster_files(sorter, tmp_path):
+    (tmp_path / "finance1.txt").write_text(FINANCE)
+    (tmp_path / "finance2.txt").write_text(FINANCE + " Audit complete.")
+    (tmp_path / "errors.txt").write_text("Error totals: " + FINANCE)
+    (tmp_path / "space.txt").write_text(ASTRONOMY)
+    (tmp_path / "photo.png").write_bytes(b"\x89PNG\r\n")
+    (tmp_path / "empty.txt").write_text("")
+
+    sorter.cluster_files(str(tmp_path))
+
+    finance = _find(tmp_path, "finance1.txt")
+    assert finance not in (None, "TXT", "Others")
+    assert _find(tmp_path, "finance2.txt") == finance
+    # A document that merely starts with "Error" is still clustered
+    assert _find(tmp_path, "errors.txt") == finance
+    assert _find(tmp_path, "space.txt") not in (None, finance, "TXT")
+    assert _find(tmp_path, "photo.png") == "Images"
+    assert _find(tmp_path, "empty.txt") == "TXT"
+    assert (tmp_path / INDEX_FILE).is_file()
+
+    # Second run: new file joins the existing topic folder
+    (tmp_path / "finance3.txt").write_text(FINANCE + " Payroll approved.")
+    sorter.cluster_files(str(tmp_path))
+    assert _find(tmp_path, "finance3.txt") == finance
+
+
+def test_other_sorts_keep_index_file(sorter, tmp_path):
+    (tmp_path / "finance.txt").write_text(FINANCE)
+    sorter.cluster_files(str(tmp_path))
+
+    (tmp_path / "notes.txt").write_text(ASTRONOMY)
+    sorter.sort_files(str(tmp_path))
+    assert (tmp_path / INDEX_FILE).is_file()
+    assert _find(tmp_path, "notes.txt") == "TXT"
+
+
+def _sorted_listdir(monkeypatch, sorter):
+    """Process files in name order so the test knows which one comes first."""
+    real_listdir = os.listdir
+    monkeypatch.setattr(sorter.os, "listdir", lambda path: sorted(real_listdir(path)))
+
+
+def test_cluster_files_skips_file_that_cannot_move(sorter, tmp_path, monkeypatch):
+    (tmp_path / "a_finance.txt").write_text(FINANCE)
+    (tmp_path / "b_space.txt").write_text(ASTRONOMY)
+
+    real_move = sorter.shutil.move
+    def move(src, dst):
+        if src.endswith("a_finance.txt"):
+            raise PermissionError("locked")
+        return real_move(src, dst)
+
+    with monkeypatch.context() as m:
+        m.setattr(sorter.shutil, "move", move)
+        sorter.cluster_files(str(tmp_path))
+
+    index = ClusterIndex.load(str(tmp_path))
+    assert [os.path.basename(p) for p in index.paths] == ["b_space.txt"]
+    assert (tmp_path / "a_finance.txt").is_file()
+
+
+def test_cluster_files_saves_index_when_run_aborts(sorter, tmp_path, monkeypatch):
+    (tmp_path / "a_finance.txt").write_text(FINANCE)
+    (tmp_path / "b_space.txt").write_text(ASTRONOMY)
+
+    real_tags = sorter.generate_tags
+    def tags(text, max_tags=5):
+        if "telescope" in text:
+            raise RuntimeError("boom")
+        return real_tags(text, max_tags)
+
+    with monkeypatch.context() as m:
+        _sorted_listdir(m, sorter)
+        m.setattr(sorter, "generate_tags", tags)
+        with pytest.raises(RuntimeError):
+            sorter.cluster_files(str(tmp_path))
+
+    index = ClusterIndex.load(str(tmp_path))
+    assert [os.path.basename(p) for p in index.paths] == ["a_finance.txt"]